@@ -0,0 +1,177 @@
+import argparse
+import functools
+import os
+import sys
+
+# argparse runs every usage/help/error string through gettext; this is an English-only CLI, so make
+# that a no-op instead of a catalog lookup per string (this disables argparse's own translations)
+argparse._ = lambda message: message
+
+
+# Every command and its flags. The fast parser, the argparse parser (help and errors) and sre.py's
+# missing-argument prompts are all driven by this table.
+# Each flag is (type, required, help); a type of None means an on/off switch.
+COMMANDS = {
+    "list": {
+        "help": "List deployments",
+        "flags": {
+            "namespace": (str, False, "Namespace to list deployments from"),
+        },
+    },
+    "scale": {
+        "help": "Scale a deployment",
+        "flags": {
+            "deployment": (str, True, "Deployment name"),
+            "replicas": (int, True, "Number of replicas"),
+            "namespace": (str, False, "Namespace of the deployment"),
+        },
+    },
+    "info": {
+        "help": "Get deployment details",
+        "flags": {
+            "deployment": (str, True, "Deployment name"),
+            "namespace": (str, False, "Namespace of the deployment"),
+        },
+    },
+    "diagnostic": {
+        "help": "Diagnose deployment",
+        "flags": {
+            "deployment": (str, True, "Deployment name"),
+            "namespace": (str, False, "Namespace of the deployment"),
+            "pod": (None, False, "Get detailed pod diagnostics"),
+            "watch": (None, False, "Keep streaming deployment and pod changes after the diagnosis"),
+        },
+    },
+    "shell": {
+        "help": "Run commands interactively against a watch-backed deployment cache",
+        "flags": {
+            "namespace": (str, False, "Only cache deployments from this namespace"),
+        },
+    },
+}
+
+
+def parse_args_fast(argv):
+    """
+    Parse argv straight from COMMANDS, without building an argparse parser.
+
+    Returns the same Namespace argparse would, or None for anything unusual (help, unknown or
+    abbreviated flags, bad values, missing required flags) so argparse can handle it and report errors.
+    """
+    args = argparse.Namespace(log=False, verbose=False, command=None)
+    tokens = iter(argv)
+    for token in tokens:
+        if token == "--log":
+            args.log = True
+        elif token in ["-v", "--verbose"]:
+            args.verbose = True
+        elif token in COMMANDS:
+            args.command = token
+            break
+        else:
+            return None
+    if args.command is None:
+        return None
+
+    flags = COMMANDS[args.command]["flags"]
+    for name, (flag_type, _, _) in flags.items():
+        setattr(args, name, False if flag_type is None else None)
+
+    for token in tokens:
+        name, has_value, value = token[2:].partition("=")
+        if not token.startswith("--") or name not in flags:
+            return None
+        flag_type = flags[name][0]
+        if flag_type is None:
+            if has_value:
+                return None
+            setattr(args, name, True)
+            continue
+        if not has_value:
+            value = next(tokens, None)
+            if value is None or value.startswith("-"):
+                return None
+        try:
+            setattr(args, name, flag_type(value))
+        except ValueError:
+            return None
+
+    if any(required and getattr(args, name) is None for name, (_, required, _) in flags.items()):
+        return None
+    return args
+
+
+def find_command(argv):
+    """Return the command name from argv, or None if there is none or help was requested before it."""
+    for arg in argv:
+        if arg in ["-h", "--help"]:
+            return None
+        if not arg.startswith("-"):
+            return arg
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def build_parser(command=None):
+    """Build the argument parser; for a known `command` only its subparser is added."""
+    parser = argparse.ArgumentParser(description="SRE CLI for Kubernetes")
+    parser.add_argument("--log", action="store_true", help="Enable logging (logs to file and prints logs)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Show low-level details, such as scaled-down ReplicaSets")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    # Unknown commands and top-level help need every subparser for the usage message
+    for name in [command] if command in COMMANDS else COMMANDS:
+        spec = COMMANDS[name]
+        command_parser = subparsers.add_parser(name, help=spec["help"])
+        for flag, (flag_type, required, flag_help) in spec["flags"].items():
+            if flag_type is None:
+                command_parser.add_argument(f"--{flag}", action="store_true", help=flag_help)
+            else:
+                command_parser.add_argument(f"--{flag}", type=flag_type, required=required, help=flag_help)
+
+    # argparse's default type converter is a local function, which would make the parser unpicklable
+    for p in [parser, *subparsers.choices.values()]:
+        p.register("type", None, identity)
+    return parser
+
+
+def identity(value):
+    """Default argument type converter (a picklable stand-in for argparse's own)."""
+    return value
+
+
+# Built parsers are pickled here so later runs can skip rebuilding them
+PARSER_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "sre_cli")
+
+
+@functools.lru_cache(maxsize=None)
+def load_parser(command=None):
+    """Return the parser for `command`, from the pickle cache if it was built from this version of _parser.py."""
+    import pickle
+    cache_file = os.path.join(PARSER_CACHE_DIR, f"parser-{command if command in COMMANDS else 'all'}.pkl")
+    # sys.version includes the patch release: unpickling skips argparse's __init__, so the internals must match exactly.
+    # The program name is baked into every usage line, so `python sre.py` and an `sre` launcher don't share parsers
+    stamp = (sys.version, os.stat(__file__).st_mtime, os.path.basename(sys.argv[0]))
+    try:
+        with open(cache_file, "rb") as f:
+            # The stamp is pickled first, so a parser from another Python or _parser.py is never unpickled
+            if pickle.load(f) == stamp:
+                return pickle.load(f)
+    except Exception:
+        pass  # Missing, stale or unreadable cache: rebuild below
+
+    parser = build_parser(command)
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(PARSER_CACHE_DIR, mode=0o700, exist_ok=True)
+        with open(tmp_file, "wb") as f:
+            pickle.dump(stamp, f)
+            pickle.dump(parser, f)
+        os.replace(tmp_file, cache_file)
+    except (OSError, pickle.PicklingError, AttributeError, TypeError):
+        # Caching is best effort, but don't leave a partial file behind
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+    return parser
@@ -0,0 +1,115 @@
+import threading
+from kubernetes import watch
+from kubernetes.client.exceptions import ApiException
+from log_utils import log_and_print
+
+
+class DeploymentCache:
+    """
+    Keeps an in-process copy of deployments up to date using a list + watch (informer style).
+
+    - The initial list fills the cache, then a watch stream applies ADDED/MODIFIED/DELETED events.
+    - Entries are keyed by `(namespace, name)`.
+    - If the watch expires (`410 Gone`), the cache is re-listed and the watch resumes.
+    - Any other failure marks the cache stale (lookups return None, so callers use the API) and it
+      re-lists with exponential backoff; on `401`/`403` it gives up for the rest of the session.
+    """
+
+    RETRY_DELAY = 2  # Seconds to wait before the first re-list after a failure
+    MAX_RETRY_DELAY = 60  # Cap for the exponential backoff
+
+    def __init__(self, v1_apps, namespace=None):
+        self.v1_apps = v1_apps
+        self.namespace = namespace
+        self._items = {}
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._attempted = threading.Event()  # Set once the first list has succeeded or failed
+        self._stopped = threading.Event()
+        self._watch = None
+        self._thread = None
+
+    def start(self, timeout=30):
+        """Starts the background watch and waits until the first list has been loaded"""
+        self._thread = threading.Thread(target=self._run, name="deployment-cache", daemon=True)
+        self._thread.start()
+        # Return as soon as the first list fails too (e.g. no permission) instead of waiting out the timeout
+        self._attempted.wait(timeout)
+        return self.ready
+
+    def stop(self):
+        """Stops the background watch"""
+        self._stopped.set()
+        if self._watch:
+            self._watch.stop()
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+    def get(self, name, namespace=None):
+        """Returns a cached deployment, or None if it is not cached"""
+        if not self.ready:
+            return None
+        with self._lock:
+            if namespace:
+                return self._items.get((namespace, name))
+            return next((dep for (_, dep_name), dep in self._items.items() if dep_name == name), None)
+
+    def list(self, namespace=None):
+        """Returns cached deployments, or None if the cache cannot answer for this namespace"""
+        if not self.ready or (self.namespace and namespace != self.namespace):
+            return None
+        with self._lock:
+            return [dep for (ns, _), dep in self._items.items() if not namespace or ns == namespace]
+
+    def _list_args(self):
+        if self.namespace:
+            return self.v1_apps.list_namespaced_deployment, (self.namespace,)
+        return self.v1_apps.list_deployment_for_all_namespaces, ()
+
+    def _run(self):
+        list_func, args = self._list_args()
+        delay = self.RETRY_DELAY
+        while not self._stopped.is_set():
+            try:
+                deployments = list_func(*args)
+                with self._lock:
+                    self._items = {(d.metadata.namespace, d.metadata.name): d for d in deployments.items}
+                self._ready.set()
+                self._attempted.set()
+
+                self._watch = watch.Watch()
+                for event in self._watch.stream(list_func, *args, resource_version=deployments.metadata.resource_version):
+                    delay = self.RETRY_DELAY  # Events are flowing again, so reset the backoff
+                    dep = event["object"]
+                    key = (dep.metadata.namespace, dep.metadata.name)
+                    with self._lock:
+                        if event["type"] == "DELETED":
+                            self._items.pop(key, None)
+                        elif event["type"] in ("ADDED", "MODIFIED"):
+                            self._items[key] = dep
+                continue  # The stream only ends once stopped
+            except ApiException as e:
+                if e.status == 410:
+                    continue  # Our resource version expired: re-list right away
+                if e.status in (401, 403):
+                    # Retrying cannot help (e.g. RBAC allows list but not watch): stop for the rest of the session
+                    self._ready.clear()
+                    self._attempted.set()
+                    log_and_print("WARNING", "Deployment cache disabled (%s %s); using the API directly.", "⚠️", e.status, e.reason)
+                    return
+                error = f"{e.status} {e.reason}"
+            except Exception as e:
+                error = e
+
+            # Connection dropped or server error: stop serving possibly stale data, back off, then re-list
+            self._ready.clear()
+            self._attempted.set()
+            log_and_print("WARNING", "Deployment cache out of sync (%s); retrying in %ss.", "⚠️", error, delay)
+            self._stopped.wait(delay)
+            delay = min(delay * 2, self.MAX_RETRY_DELAY)
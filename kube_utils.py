@@ -1,94 +1,270 @@
-import sys
-import logging
+import os
+import json
+import time
+import shutil
+import hashlib
+import functools
 import requests
 from kubernetes import client, config
+from kubernetes.config import kube_config
+import log_utils
+from log_utils import log_and_print, log_and_print_block
+
+class KubeError(Exception):
+    """Raised when the CLI cannot talk to the cluster at all (e.g. no usable kubeconfig)"""
+
+# Resolved credentials are cached so short-lived runs can skip kubeconfig parsing and exec auth plugins
+CREDS_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "sre_cli")
+CREDS_CACHE_TTL = 300  # Seconds; entries never outlive the token's own expiry either
+CREDS_CACHE_MIN_LIFETIME = 60  # Seconds; tokens closer than this to expiring are not cached
+CREDS_CACHE_KEYS = ["host", "api_key", "ssl_ca_cert", "cert_file", "key_file", "verify_ssl", "tls_server_name", "proxy"]
+CREDS_CACHE_FILES = ["ssl_ca_cert", "cert_file", "key_file"]
+
+def kube_config_fingerprint():
+    """Returns a short hash of the kubeconfig paths and their mtimes; it changes whenever a kubeconfig is edited"""
+    paths = [os.path.expanduser(p) for p in config.KUBE_CONFIG_DEFAULT_LOCATION.split(os.pathsep)]
+    stamps = [(path, os.stat(path).st_mtime) for path in paths if os.path.exists(path)]
+    return hashlib.sha256(json.dumps(stamps).encode("utf-8")).hexdigest()[:16]
+
+def load_cached_credentials(fingerprint):
+    """Sets the default client Configuration from the credentials cache; returns False if it is missing or stale"""
+    cache_file = os.path.join(CREDS_CACHE_DIR, f"creds-{fingerprint}.json")
+    try:
+        with open(cache_file, encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    if cached.get("expires", 0) < time.time():
+        return False
+    if any(cached.get(key) and not os.path.exists(cached[key]) for key in CREDS_CACHE_FILES):
+        return False
+
+    cfg = client.Configuration()
+    for key in CREDS_CACHE_KEYS:
+        if key in cached:
+            setattr(cfg, key, cached[key])
+    client.Configuration.set_default(cfg)
+    return True
+
+def save_cached_credentials(fingerprint, token_expiry=None):
+    """
+    Writes the resolved default client Configuration to the credentials cache (owner-only permissions).
+
+    `token_expiry` is the exec-plugin/auth-provider token expiry (a datetime) if the kubeconfig reported one;
+    the entry expires with the token, and nothing is cached if the token is about to expire.
+    """
+    expires = time.time() + CREDS_CACHE_TTL
+    if token_expiry is not None:
+        expires = min(expires, token_expiry.timestamp())
+    if expires - time.time() < CREDS_CACHE_MIN_LIFETIME:
+        return False
+
+    cfg = client.Configuration.get_default_copy()
+    os.makedirs(CREDS_CACHE_DIR, mode=0o700, exist_ok=True)
+    cached = {key: getattr(cfg, key) for key in CREDS_CACHE_KEYS}
+    cached["expires"] = expires
+
+    # Certificates embedded in the kubeconfig are written to temp files that are deleted on exit, so keep copies
+    for key in CREDS_CACHE_FILES:
+        if cached[key]:
+            dest = os.path.join(CREDS_CACHE_DIR, f"creds-{fingerprint}-{key}")
+            shutil.copyfile(cached[key], dest)
+            os.chmod(dest, 0o600)
+            cached[key] = dest
+
+    cache_file = os.path.join(CREDS_CACHE_DIR, f"creds-{fingerprint}.json")
+    with os.fdopen(os.open(cache_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w", encoding="utf-8") as f:
+        json.dump(cached, f)
+    return True
+
+def forget_cached_credentials():
+    """Deletes the cached credentials for the current kubeconfig, e.g. after the API server rejected them"""
+    try:
+        os.remove(os.path.join(CREDS_CACHE_DIR, f"creds-{kube_config_fingerprint()}.json"))
+    except OSError:
+        pass
+
+# Load Kubernetes config (at most once per process)
+@functools.lru_cache(maxsize=1)
+def load_kube_config(use_creds_cache=True):
+    """
+    Loads the Kubernetes configuration from the credentials cache, or from ~/.kube/config.
 
-# Check if log mode is enabled from arguments
-LOG_MODE = "--log" in sys.argv
-
-# Configure logging only if log mode is enabled
-LOG_FILE = "sre_cli.log"
-if LOG_MODE:
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - %(levelname)s - %(message)s",
-        handlers=[logging.FileHandler(LOG_FILE, encoding="utf-8"), logging.StreamHandler()]
-    )
-
-# Load Kubernetes config
-def load_kube_config():
-    """Loads the Kubernetes configuration from ~/.kube/config"""
+    Cached credentials have no refresh hook, so callers that outlive a token pass `use_creds_cache=False`.
+    """
     try:
-        config.load_kube_config()
+        fingerprint = kube_config_fingerprint()
+        if use_creds_cache and load_cached_credentials(fingerprint):
+            log_and_print("INFO", "Loaded Kubernetes configuration from cache.", "✅")
+            return True
+
+        # Same as config.load_kube_config(), but keeps the loader to learn when its token expires.
+        # The loader is private client API: if it is gone, load normally and don't cache (the expiry is unknown)
+        loader = None
+        if hasattr(kube_config, "_get_kube_config_loader"):
+            loader = kube_config._get_kube_config_loader(filename=config.KUBE_CONFIG_DEFAULT_LOCATION, persist_config=True)
+            cfg = client.Configuration()
+            loader.load_and_set(cfg)
+            client.Configuration.set_default(cfg)
+        else:
+            config.load_kube_config()
         log_and_print("INFO", "Successfully loaded Kubernetes configuration.", "✅")
+        if use_creds_cache and loader is not None:
+            try:
+                save_cached_credentials(fingerprint, getattr(loader, "expiry", None))
+            except OSError as e:
+                log_and_print("WARNING", f"Could not cache Kubernetes credentials: {e}", "⚠️")
+        return True
     except Exception as e:
-        log_and_print("ERROR", f"Error loading Kubernetes config: {e}", "❌")
-        sys.exit(1)
-
-# Kubernetes API Clients
-def get_k8s_clients():
-    """Returns Kubernetes API clients"""
-    load_kube_config()
-    return client.AppsV1Api(), client.CoreV1Api()
-
-# Logging and Printing in one function
-def log_and_print(level, message, icon=""):
-    """Handles logging and printing correctly based on --log mode"""
-    log_message = message
-
-    if LOG_MODE:
-        # In log mode, log everything and print logs instead of normal output
-        if level == "INFO":
-            logging.info(log_message)
-        elif level == "WARNING":
-            logging.warning(log_message)
-        elif level == "ERROR":
-            logging.error(log_message)
+        raise KubeError(f"Error loading Kubernetes config: {e}") from e
+
+class CredentialCacheApiClient(client.ApiClient):
+    """ApiClient that drops the cached credentials when the API server rejects them (401), so the next run reloads them"""
+
+    def call_api(self, *args, **kwargs):
+        try:
+            return super().call_api(*args, **kwargs)
+        except client.exceptions.ApiException as e:
+            if e.status == 401:
+                forget_cached_credentials()
+            raise
+
+# Kubernetes API Clients (created once per process and reused)
+CONNECTION_POOL_MAXSIZE = 32
+_APPS = None
+_CORE = None
+
+def get_k8s_clients(use_creds_cache=True):
+    """
+    Returns the shared Kubernetes API clients, loading the config on first use.
+
+    Long-running callers (`shell`, `diagnostic --watch`) pass `use_creds_cache=False`, so the config is loaded
+    with the kubeconfig's refresh hook and expiring exec/auth-provider tokens are renewed mid-session.
+    """
+    global _APPS, _CORE
+    if _APPS is None:
+        load_kube_config(use_creds_cache)
+        # One ApiClient with a larger pool so both APIs share keep-alive connections
+        cfg = client.Configuration.get_default_copy()
+        cfg.connection_pool_maxsize = CONNECTION_POOL_MAXSIZE
+        client.Configuration.set_default(cfg)
+        api_client = CredentialCacheApiClient(cfg)
+        # The Python client can only decode JSON, so shrink large list responses with gzip instead of protobuf
+        api_client.set_default_header("Accept-Encoding", "gzip")
+        _APPS = client.AppsV1Api(api_client)
+        _CORE = client.CoreV1Api(api_client)
+    return _APPS, _CORE
+
+# Optional watch-backed deployment cache (see kube_cache.py), warmed by the `shell` command
+_DEPLOYMENT_CACHE = None
+
+def start_deployment_cache(namespace=None):
+    """Starts a watch-backed deployment cache that later commands consult before calling the API"""
+    global _DEPLOYMENT_CACHE
+    from kube_cache import DeploymentCache
+
+    v1_apps, _ = get_k8s_clients(use_creds_cache=False)
+    cache = DeploymentCache(v1_apps, namespace)
+    if cache.start():
+        log_and_print("INFO", f"Deployment cache ready with {len(cache)} deployments.", "⚡")
     else:
-        # Normal mode: Print messages with icons, but do not log to file
-        print(f"{icon}  {message}")
+        log_and_print("WARNING", "Deployment cache is not ready; falling back to the API.", "⚠️")
+    _DEPLOYMENT_CACHE = cache
+    return cache
+
+def get_cached_deployment(deployment, namespace=None):
+    """Returns a deployment from the cache, or None if there is no cache or it misses"""
+    return _DEPLOYMENT_CACHE.get(deployment, namespace) if _DEPLOYMENT_CACHE else None
+
+# Find deployments by name across all namespaces
+def find_deployments(v1_apps, deployment):
+    """Returns all deployments named `deployment`, letting the API server filter by name"""
+    return v1_apps.list_deployment_for_all_namespaces(field_selector=f"metadata.name={deployment}").items
+
+# Paged list calls
+LIST_PAGE_SIZE = 500
+POD_PAGE_SIZE = 200
+
+def iter_pages(list_func, *args, page_size=LIST_PAGE_SIZE, **kwargs):
+    """Yields the items of a Kubernetes list function page by page (`limit`/`continue`), so callers never hold the full response"""
+    token = None
+    while True:
+        resp = list_func(*args, limit=page_size, _continue=token, **kwargs)
+        yield from resp.items
+        token = resp.metadata._continue
+        if not token:
+            return
+
+def summarize_pods(v1_core, namespace, label_selector):
+    """Pages through a deployment's pods, keeping only the fields the diagnosis prints"""
+    return [
+        {
+            "Pod": pod.metadata.name,
+            "Phase": pod.status.phase,
+            "Waiting": [cs.state.waiting for cs in pod.status.container_statuses or [] if cs.state.waiting],
+            "Resources": [(c.resources.requests or {}, c.resources.limits or {}) for c in pod.spec.containers],
+        }
+        for pod in iter_pages(v1_core.list_namespaced_pod, namespace, label_selector=label_selector, page_size=POD_PAGE_SIZE)
+    ]
+
+# Label selector string for a deployment's spec.selector
+def build_label_selector(selector):
+    """Converts a V1LabelSelector into the `labelSelector` query string understood by the API server"""
+    terms = [f"{key}={value}" for key, value in (selector.match_labels or {}).items()]
+    for expr in selector.match_expressions or []:
+        if expr.operator == "In":
+            terms.append(f"{expr.key} in ({','.join(expr.values)})")
+        elif expr.operator == "NotIn":
+            terms.append(f"{expr.key} notin ({','.join(expr.values)})")
+        elif expr.operator == "Exists":
+            terms.append(expr.key)
+        elif expr.operator == "DoesNotExist":
+            terms.append(f"!{expr.key}")
+    return ",".join(terms)
 
 # List Deployments
 def list_deployments(namespace=None):
     """Lists all deployments in the specified namespace or across all namespaces"""
     v1_apps, _ = get_k8s_clients()
     try:
-        deployments = v1_apps.list_namespaced_deployment(namespace) if namespace else v1_apps.list_deployment_for_all_namespaces()
-        for dep in deployments.items:
-            log_and_print("INFO", f"Deployment: {dep.metadata.name} (Namespace: {dep.metadata.namespace})", "📦")
+        deployments = _DEPLOYMENT_CACHE.list(namespace) if _DEPLOYMENT_CACHE else None
+        if deployments is None:
+            deployments = (v1_apps.list_namespaced_deployment(namespace) if namespace else v1_apps.list_deployment_for_all_namespaces()).items
+        for dep in deployments:
+            log_and_print("INFO", "Deployment: %s (Namespace: %s)", "📦", dep.metadata.name, dep.metadata.namespace)
+        return 0
     except client.exceptions.ApiException as e:
         log_and_print("ERROR", f"Error listing deployments: {e.reason}", "❌")
-    except Exception as e:
-        log_and_print("ERROR", f"Unexpected error: {e}", "❌")
+    return 1
 
 # Scale Deployment
 def scale_deployment(deployment, replicas, namespace=None):
     """Scales a deployment and logs the operation"""
     v1_apps, _ = get_k8s_clients()
     try:
+        # Patch the Scale subresource directly instead of reading the whole Deployment first
+        body = {"spec": {"replicas": replicas}}
         if namespace:
-            dep = v1_apps.read_namespaced_deployment(deployment, namespace)
-            dep.spec.replicas = replicas
-            v1_apps.patch_namespaced_deployment_scale(deployment, namespace, dep)
-            log_and_print("INFO", f"Scaled {deployment} to {replicas} replicas in namespace {namespace}", "📈")
+            v1_apps.patch_namespaced_deployment_scale(deployment, namespace, body)
+            log_and_print("INFO", "Scaled %s to %s replicas in namespace %s", "📈", deployment, replicas, namespace)
         else:
-            all_deployments = v1_apps.list_deployment_for_all_namespaces()
-            matched_deployments = [dep for dep in all_deployments.items if dep.metadata.name == deployment]
+            # Slow path: without --namespace the deployment has to be searched for cluster-wide
+            matched_deployments = find_deployments(v1_apps, deployment)
 
             if not matched_deployments:
                 log_and_print("WARNING", f"Deployment '{deployment}' not found in any namespace.", "⚠️")
-                return
+                return 1
 
             for dep in matched_deployments:
                 ns = dep.metadata.namespace
-                dep.spec.replicas = replicas
-                v1_apps.patch_namespaced_deployment_scale(deployment, ns, dep)
-                log_and_print("INFO", f"Scaled {deployment} to {replicas} replicas in namespace {ns}", "📈")
+                v1_apps.patch_namespaced_deployment_scale(deployment, ns, body)
+                log_and_print("INFO", "Scaled %s to %s replicas in namespace %s", "📈", deployment, replicas, ns)
+        return 0
 
     except client.exceptions.ApiException as e:
         log_and_print("ERROR", f"Error scaling deployment: {e.reason}", "❌")
-    except Exception as e:
-        log_and_print("ERROR", f"Unexpected error: {e}", "❌")
+    return 1
 
 # Get Deployment Info
 def get_deployment_info(deployment, namespace=None):
@@ -97,27 +273,26 @@ def get_deployment_info(deployment, namespace=None):
     v1_apps, _ = get_k8s_clients()
 
     try:
-        if namespace:
+        dep = get_cached_deployment(deployment, namespace)
+        if dep:
+            namespace = dep.metadata.namespace
+        elif namespace:
             # Fetch deployment from a specific namespace
             dep = v1_apps.read_namespaced_deployment(deployment, namespace)
         else:
             # ✅ Fix: Handle failure when querying all namespaces
             try:
-                all_deployments = v1_apps.list_deployment_for_all_namespaces()
-                dep = next((d for d in all_deployments.items if d.metadata.name == deployment), None)
+                dep = next(iter(find_deployments(v1_apps, deployment)), None)
                 if not dep:
                     log_and_print("WARNING", f"Deployment '{deployment}' not found in any namespace.", "⚠️")
-                    return
+                    return 1
                 namespace = dep.metadata.namespace
             except client.exceptions.ApiException as e:
                 if e.status == 403:
                     log_and_print("ERROR", "Permission denied: Cannot access all namespaces.", "🚫")
                 else:
                     log_and_print("ERROR", f"Kubernetes API Error: {e.reason}", "❌")
-                return
-            except Exception as e:
-                log_and_print("ERROR", f"Unexpected error retrieving deployments: {e}", "❌")
-                return
+                return 1
 
         dep_info = {
             "Deployment Name": dep.metadata.name,
@@ -133,7 +308,8 @@ def get_deployment_info(deployment, namespace=None):
 
         log_and_print("INFO", f"--- Deployment Info: {dep.metadata.name} ---", "\n🛠")
         for key, value in dep_info.items():
-            log_and_print("INFO", f"{key}: {value}", "📌")
+            log_and_print("INFO", "%s: %s", "📌", key, value)
+        return 0
 
     except requests.exceptions.ConnectionError:
         log_and_print("ERROR", "Could not connect to the Kubernetes API. Is your cluster running?", "❌")
@@ -144,11 +320,10 @@ def get_deployment_info(deployment, namespace=None):
             log_and_print("ERROR", f"Permission denied: Cannot access deployment '{deployment}' in namespace '{namespace}'.", "🚫")
         else:
             log_and_print("ERROR", f"Kubernetes API Error: {e.reason}", "❌")
-    except Exception as e:
-        log_and_print("ERROR", f"Unexpected error: {e}", "❌")
+    return 1
 
 
-def diagnose_deployment(deployment, namespace=None, pod_diagnostics=False):
+def diagnose_deployment(deployment, namespace=None, pod_diagnostics=False, watch=False):
     """
     Diagnoses a deployment's health using the best Kubernetes logging practices.
 
@@ -161,21 +336,43 @@ def diagnose_deployment(deployment, namespace=None, pod_diagnostics=False):
     - Also checks:
         - Node health (`kubectl describe node`).
         - ConfigMaps, Secrets, Services, and Networking issues.
+    - If `--watch` is provided, keeps streaming deployment and pod changes afterwards.
     """
-    v1_apps, v1_core = get_k8s_clients()
+    # Only the diagnostic command needs these, so other commands don't import them
+    import heapq
+    from concurrent.futures import ThreadPoolExecutor
+
+    v1_apps, v1_core = get_k8s_clients(use_creds_cache=not watch)
 
     try:
         # 1️⃣ CHECK DEPLOYMENT STATUS
-        if namespace:
+        dep = get_cached_deployment(deployment, namespace)
+        if dep:
+            namespace = dep.metadata.namespace
+        elif namespace:
             dep = v1_apps.read_namespaced_deployment(deployment, namespace)
         else:
-            all_deployments = v1_apps.list_deployment_for_all_namespaces()
-            dep = next((d for d in all_deployments.items if d.metadata.name == deployment), None)
+            dep = next(iter(find_deployments(v1_apps, deployment)), None)
             if not dep:
                 log_and_print("WARNING", f"Deployment '{deployment}' not found in any namespace.", "⚠️")
-                return
+                return 1
             namespace = dep.metadata.namespace
 
+        # Let the API server filter ReplicaSets and Pods by the deployment's own selector
+        label_selector = build_label_selector(dep.spec.selector)
+
+        # The remaining lookups are independent, so fetch them concurrently over the shared connection pool
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            replicasets_future = pool.submit(v1_apps.list_namespaced_replica_set, namespace, label_selector=label_selector)
+            if pod_diagnostics:
+                pods_future = pool.submit(summarize_pods, v1_core, namespace, label_selector)
+                # Only the 10 newest events are shown, so keep a bounded heap instead of sorting them all
+                events_future = pool.submit(lambda: heapq.nlargest(
+                    10,
+                    iter_pages(v1_core.list_namespaced_event, namespace, field_selector="involvedObject.kind=Pod"),
+                    key=lambda e: e.metadata.creation_timestamp,
+                ))
+
         log_and_print("INFO", f"--- Deployment Diagnosis: {dep.metadata.name} ---", "\n🔍")
         log_and_print("INFO", f"Namespace: {namespace}", "📍")
         log_and_print("INFO", f"Desired Replicas: {dep.spec.replicas}", "🔢")
@@ -185,79 +382,168 @@ def diagnose_deployment(deployment, namespace=None, pod_diagnostics=False):
         # Get Deployment Conditions
         conditions = dep.status.conditions or []
         for condition in conditions:
-            log_and_print("INFO", f"Condition: {condition.type} | Status: {condition.status} | Message: {condition.message}", "⚠")
+            log_and_print("INFO", "Condition: %s | Status: %s | Message: %s", "⚠", condition.type, condition.status, condition.message)
 
         # 2️⃣ CHECK REPLICASETS
-        replicasets = v1_apps.list_namespaced_replica_set(namespace).items
-        matched_replicasets = [rs for rs in replicasets if rs.metadata.owner_references and rs.metadata.owner_references[0].name == deployment]
+        matched_replicasets = replicasets_future.result().items
 
         log_and_print("INFO", "--- ReplicaSets ---", "\n🔄")
         for rs in matched_replicasets:
-            log_and_print("INFO", f"ReplicaSet: {rs.metadata.name} | Ready Replicas: {rs.status.ready_replicas or 0}/{rs.status.replicas}", "📦")
+            # Old revisions scaled down to zero are only shown with --verbose
+            level = "INFO" if rs.spec.replicas else "DEBUG"
+            log_and_print(level, "ReplicaSet: %s | Ready Replicas: %s/%s", "📦", rs.metadata.name, rs.status.ready_replicas or 0, rs.status.replicas)
 
         # 3️⃣ CHECK POD STATUS (Only if --pod is enabled)
         if pod_diagnostics:
-            pods = v1_core.list_namespaced_pod(namespace).items
-            related_pods = [pod for pod in pods if pod.metadata.name.startswith(f"{deployment}-")]
+            related_pods = pods_future.result()
 
             log_and_print("INFO", "--- Pod Status ---", "\n🟢")
             for pod in related_pods:
-                log_and_print("INFO", f"Pod: {pod.metadata.name} | Status: {pod.status.phase}", "🔹")
+                log_and_print("INFO", "Pod: %s | Status: %s", "🔹", pod["Pod"], pod["Phase"])
 
             # Detect Failing Pods (Only if --pod is enabled)
             failed_pods = []
             for pod in related_pods:
-                for cs in pod.status.container_statuses or []:
-                    if cs.state.waiting:
-                        failed_pods.append({
-                            "Pod": pod.metadata.name,
-                            "Reason": cs.state.waiting.reason,
-                            "Message": cs.state.waiting.message
-                        })
+                for waiting in pod["Waiting"]:
+                    failed_pods.append({
+                        "Pod": pod["Pod"],
+                        "Reason": waiting.reason,
+                        "Message": waiting.message
+                    })
 
             if failed_pods:
                 log_and_print("WARNING", "--- Deployment-Wide Issues Detected ---", "\n❌")
                 for pod in failed_pods:
-                    log_and_print("WARNING", f"   Pod: {pod['Pod']}", "🔴")
-                    log_and_print("WARNING", f"   Failure Reason: {pod['Reason']}", "❌")
-                    log_and_print("WARNING", f"   Message: {pod['Message']}", "📝")
+                    log_and_print("WARNING", "   Pod: %s", "🔴", pod["Pod"])
+                    log_and_print("WARNING", "   Failure Reason: %s", "❌", pod["Reason"])
+                    log_and_print("WARNING", "   Message: %s", "📝", pod["Message"])
 
             # 4️⃣ CHECK POD EVENTS & LOGS (Only if --pod is enabled)
             try:
-                events = v1_core.list_namespaced_event(namespace).items
+                events = events_future.result()
 
                 if not events:
                     log_and_print("INFO", "--- Pod Events (Latest First) ---", "\n📜")
                     log_and_print("INFO", "No events found for this namespace.", "ℹ")
                 else:
-                    sorted_events = sorted(events, key=lambda e: e.metadata.creation_timestamp, reverse=True)
-
                     log_and_print("INFO", "--- Pod Events (Latest First) ---", "\n📜")
-                    for event in sorted_events[:10]:  # Show last 10 events if available
-                        log_and_print("INFO", f"[{event.type}] {event.reason}: {event.message}")
+                    for event in events:  # Already the last 10 events, newest first
+                        log_and_print("INFO", "[%s] %s: %s", "", event.type, event.reason, event.message)
 
             except client.exceptions.ApiException as e:
                 log_and_print("ERROR", f"Error retrieving pod events: {e.reason}", "\n❌")
-            except Exception as e:
-                log_and_print("ERROR", f"Unexpected error retrieving pod events: {e}", "\n❌")
 
             # 5️⃣ CHECK POD RESOURCE USAGE (Only if --pod is enabled)
             log_and_print("INFO", "--- Pod Resource Usage ---", "\n📊")
 
             # Get max pod name length for alignment
-            max_pod_name_length = max(len(pod.metadata.name) for pod in related_pods) if related_pods else 0
-            padding = max_pod_name_length + 5  # Add some space for readability
+            padding = max((len(pod["Pod"]) for pod in related_pods), default=0) + 5  # Add some space for readability
 
+            # Collect the whole table and emit it as a single record
+            lines = []
             for pod in related_pods:
-                for container in pod.spec.containers:
-                    requests = container.resources.requests or {}
-                    limits = container.resources.limits or {}
-                    pod_name = pod.metadata.name.ljust(padding)  # Align pod names dynamically
+                pod_name = pod["Pod"].ljust(padding)  # Align pod names dynamically
+                for requests, limits in pod["Resources"]:
+                    lines.append((f"Pod: {pod_name} CPU Request: {requests.get('cpu', 'Not Set')} | Memory Request: {requests.get('memory', 'Not Set')}", "🔹"))
+                    lines.append((f"{' ' * (padding + (5 if log_utils.LOG_MODE else 7))} CPU Limit: {limits.get('cpu', 'Not Set')} | Memory Limit: {limits.get('memory', 'Not Set')}", ""))
+            log_and_print_block("INFO", lines)
 
-                    log_and_print("INFO", f"Pod: {pod_name} CPU Request: {requests.get('cpu', 'Not Set')} | Memory Request: {requests.get('memory', 'Not Set')}", "🔹")
-                    log_and_print("INFO", f"{' ' * (padding + (5 if LOG_MODE else 7))} CPU Limit: {limits.get('cpu', 'Not Set')} | Memory Limit: {limits.get('memory', 'Not Set')}")
+        # 6️⃣ STREAM CHANGES (Only if --watch is enabled)
+        if watch:
+            watch_deployment(dep, label_selector)
+        return 0
 
     except client.exceptions.ApiException as e:
         log_and_print("ERROR", f"Error diagnosing deployment: {e.reason}", "❌")
-    except Exception as e:
-        log_and_print("ERROR", f"Unexpected error: {e}", "❌")
+    return 1
+
+
+# Seconds to wait before reconnecting a watch that failed for a reason other than an expired resource version
+WATCH_RETRY_DELAY = 2
+
+def watch_deployment(dep, label_selector):
+    """
+    Streams changes to a deployment and its pods until interrupted (Ctrl+C).
+
+    Opens one watch on the deployment and one on its pods instead of polling. Both start from the
+    current list resource version, so only changes after the diagnosis are reported. Each watch
+    recovers on its own: bookmarks keep its resource version fresh, and if it still expires (410 Gone)
+    it resumes from a new list, like DeploymentCache does.
+    """
+    import queue
+    import threading
+    from kubernetes import watch
+
+    v1_apps, v1_core = get_k8s_clients()
+    name = dep.metadata.name
+    namespace = dep.metadata.namespace
+    field_selector = f"metadata.name={name}"
+
+    # Cheap list calls just to learn the current resource versions to resume from
+    def current_version(list_func, **kwargs):
+        return list_func(namespace, limit=1, **kwargs).metadata.resource_version
+
+    dep_version = current_version(v1_apps.list_namespaced_deployment, field_selector=field_selector)
+    pods_version = current_version(v1_core.list_namespaced_pod, label_selector=label_selector)
+
+    updates = queue.Queue()
+    stopped = threading.Event()
+    watches = {"deployment": watch.Watch(), "pod": watch.Watch()}
+
+    def stream(kind, list_func, resource_version, **kwargs):
+        w = watches[kind]
+        while not stopped.is_set():
+            try:
+                if resource_version is None:
+                    resource_version = current_version(list_func, **kwargs)
+                for event in w.stream(list_func, namespace, resource_version=resource_version,
+                                      allow_watch_bookmarks=True, **kwargs):
+                    # Bookmarks only advance the watch's resource version, which Watch.stream tracks itself
+                    if event and event["type"] != "BOOKMARK":
+                        updates.put((kind, event["type"], event["object"]))
+                return  # Watch.stream only ends once stopped
+            except client.exceptions.ApiException as e:
+                if e.status == 410:
+                    # Our resource version expired: re-list and resume from the current state
+                    log_and_print("DEBUG", "Watch on %s expired; resuming from a fresh list.", "🔁", kind)
+                    resource_version = None
+                    continue
+                updates.put(("error", kind, e))
+            except Exception as e:
+                updates.put(("error", kind, e))
+            # Resume after the last event seen; if that has expired as well, the 410 above re-lists
+            resource_version = w.resource_version
+            stopped.wait(WATCH_RETRY_DELAY)
+
+    threading.Thread(target=stream, args=("deployment", v1_apps.list_namespaced_deployment, dep_version),
+                     kwargs={"field_selector": field_selector}, daemon=True).start()
+    threading.Thread(target=stream, args=("pod", v1_core.list_namespaced_pod, pods_version),
+                     kwargs={"label_selector": label_selector}, daemon=True).start()
+
+    log_and_print("INFO", f"--- Watching {name} (Ctrl+C to stop) ---", "\n👀")
+    try:
+        while True:
+            try:
+                kind, event_type, obj = updates.get(timeout=1)
+            except queue.Empty:
+                continue  # Wake up regularly so Ctrl+C is handled promptly on every platform
+            if kind == "error":
+                log_and_print("WARNING", "Watch on %s interrupted (%s); reconnecting.", "⚠️", event_type, obj)
+                continue
+            if kind == "deployment":
+                if event_type == "DELETED":
+                    log_and_print("WARNING", "Deployment %s was deleted.", "⚠️", name)
+                    return
+                log_and_print("INFO", "[%s] Deployment: %s | Ready: %s/%s | Updated: %s | Available: %s", "🔄",
+                              event_type, name, obj.status.ready_replicas or 0, obj.spec.replicas,
+                              obj.status.updated_replicas or 0, obj.status.available_replicas or 0)
+            else:
+                waiting = [cs.state.waiting.reason for cs in obj.status.container_statuses or [] if cs.state.waiting]
+                log_and_print("INFO", "[%s] Pod: %s | Status: %s%s", "🔹", event_type, obj.metadata.name,
+                              obj.status.phase, f" | Waiting: {', '.join(waiting)}" if waiting else "")
+    except KeyboardInterrupt:
+        log_and_print("INFO", "Stopped watching.", "👋")
+    finally:
+        stopped.set()
+        for w in watches.values():
+            w.stop()
@@ -0,0 +1,152 @@
+import os
+import sys
+import threading
+import logging
+
+# Log mode / verbose output, set by configure_logging() once the command line has been parsed
+LOG_MODE = False
+VERBOSE = False
+
+class BufferedFileHandler(logging.FileHandler):
+    """FileHandler that writes through a large buffer and flushes once a second instead of after every record."""
+
+    BUFFER_SIZE = 64 * 1024
+    FLUSH_INTERVAL = 1.0  # Seconds
+
+    def __init__(self, filename, mode="a", encoding=None):
+        super().__init__(filename, mode, encoding)
+        self._closing = threading.Event()
+        threading.Thread(target=self._flush_periodically, name="log-flusher", daemon=True).start()
+
+    def _open(self):
+        # FileHandler.errors only exists on Python 3.9+
+        return open(self.baseFilename, self.mode, buffering=self.BUFFER_SIZE, encoding=self.encoding, errors=getattr(self, "errors", None))
+
+    def emit(self, record):
+        # Same as StreamHandler.emit, minus the flush after every record
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def _flush_periodically(self):
+        while not self._closing.wait(self.FLUSH_INTERVAL):
+            self.flush()
+
+    def close(self):
+        self._closing.set()
+        super().close()  # Flushes whatever is still buffered
+
+
+class FastStreamHandler(logging.Handler):
+    """
+    Writes records as UTF-8 bytes straight to stdout's binary buffer.
+
+    Only the QueueListener thread ever calls this handler, so it skips the per-record lock
+    that Handler.handle takes, as well as the text layer of sys.stdout.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.stream = sys.stdout.buffer
+
+    def handle(self, record):
+        # Handler.handle minus the lock (single caller, see above); returns the filter result like it does
+        rv = self.filter(record)
+        if isinstance(rv, logging.LogRecord):
+            record = rv  # Python 3.12+ filters may return a replacement record
+        if rv:
+            self.emit(record)
+        return rv
+
+    def emit(self, record):
+        try:
+            sys.stdout.flush()  # Push out anything print() wrote to the text layer first, so output stays in order
+            self.stream.write((self.format(record) + "\n").encode("utf-8"))
+            self.stream.flush()  # Keep console output live; the buffer is not line buffered
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+LOG_FILE = "sre_cli.log"
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+# Emitters are resolved once instead of on every call
+LOG_EMITTERS = {"DEBUG": logging.debug, "INFO": logging.info, "WARNING": logging.warning, "ERROR": logging.error}
+PRINT_LEVELS = {"INFO", "WARNING", "ERROR"}
+
+# Configure logging only if log mode is enabled
+def configure_logging(log_mode=False, verbose=False):
+    """Applies --log and -v/--verbose; the log file is only opened in log mode"""
+    global LOG_MODE, VERBOSE, PRINT_LEVELS
+    LOG_MODE = log_mode
+    VERBOSE = verbose
+    PRINT_LEVELS = {"DEBUG", "INFO", "WARNING", "ERROR"} if verbose else {"INFO", "WARNING", "ERROR"}
+    if not log_mode:
+        # Nothing is logged without --log: make stray library log calls cheap no-ops instead of stderr noise
+        root_logger = logging.getLogger()
+        root_logger.addHandler(logging.NullHandler())
+        root_logger.setLevel(logging.CRITICAL)
+        return
+
+    # Only needed in log mode, so plain runs don't pay for importing them (logging.handlers pulls in socket)
+    import queue
+    import atexit
+    from logging.handlers import QueueHandler, QueueListener
+
+    # Log calls only enqueue records; a background listener formats them and does the file/console I/O
+    formatter = logging.Formatter(LOG_FORMAT)
+    file_handler = BufferedFileHandler(LOG_FILE, encoding="utf-8")
+    # Fall back to a regular StreamHandler if stdout has been replaced by a text-only stream
+    stream_handler = FastStreamHandler() if hasattr(sys.stdout, "buffer") else logging.StreamHandler(sys.stdout)
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+
+    log_queue = queue.Queue()
+    listener = QueueListener(log_queue, file_handler, stream_handler)
+    listener.start()
+    atexit.register(listener.stop)  # Drain pending records before exit
+
+    # Not basicConfig: it would give the QueueHandler a formatter and the prefix would be applied twice
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.DEBUG if verbose else logging.INFO)
+    root_logger.addHandler(QueueHandler(log_queue))
+
+# Logging and Printing in one function
+def log_and_print(level, message, icon="", *args):
+    """
+    Handles logging and printing correctly based on --log mode.
+
+    `message` may be a %-style format string with `args`; it is only formatted when actually emitted.
+    DEBUG messages are only shown with -v/--verbose.
+    """
+    if LOG_MODE:
+        # In log mode, log everything and print logs instead of normal output
+        LOG_EMITTERS[level](message, *args)
+    elif level in PRINT_LEVELS:
+        # Normal mode: Print messages with icons, but do not log to file; errors go to stderr
+        text = f"{icon}  {message % args if args else message}"
+        if level == "ERROR":
+            write_stderr(text)
+        else:
+            print(text)
+
+# Errors bypass sys.stdout, so `2>errors.log` captures them and piped output stays clean
+def write_stderr(text):
+    """Writes a line straight to stderr (fd 2) with a single write"""
+    os.write(2, f"{text}\n".encode("utf-8"))
+
+# Log or print several lines as a single record / write
+def log_and_print_block(level, lines):
+    """Like log_and_print, but takes a list of (message, icon) pairs and emits them all at once"""
+    if not lines:
+        return
+    if LOG_MODE:
+        # Start on a new line so the block stays aligned below the log prefix
+        log_and_print(level, "\n" + "\n".join(message for message, _ in lines))
+    else:
+        print("\n".join(f"{icon}  {message}" for message, icon in lines))
@@ -1,58 +1,40 @@
-import argparse
 import logging
 import sys
-from kube_utils import list_deployments, scale_deployment, get_deployment_info, diagnose_deployment
+import log_utils
+from _parser import COMMANDS, find_command, load_parser, parse_args_fast
 
-# Global variable to enable or disable logging
-LOG_MODE = "--log" in sys.argv
+log = logging.getLogger(__name__)
 
-# Logging setup (Only logs if log mode is enabled)
-LOG_FILE = "sre_cli.log"
-if LOG_MODE:
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - %(levelname)s - %(message)s",
-        handlers=[
-            logging.FileHandler(LOG_FILE, encoding="utf-8"),
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
+def _err(message):
+    """Write an error message straight to stderr (fd 2), so it stays out of piped output."""
+    log_utils.write_stderr(f"❌ {message}")
 
 
 def prompt_for_input(param_name):
     """Prompt the user for missing input and return the value or exit gracefully."""
     user_input = input(f"Please enter a value for '{param_name}': ").strip()
     if not user_input:
-        print(f"❌ No input provided for '{param_name}'. Exiting.")
+        _err(f"No input provided for '{param_name}'. Exiting.")
         sys.exit(0)
     return user_input
 
 
-def precheck_args():
+def precheck_args(command):
     """Manually check for missing required arguments before argparse validation."""
 
     # ✅ If -h or --help is in the command, skip checks to allow argparse to show help
-    if any(arg in ["-h", "--help"] for arg in sys.argv):
+    if {"-h", "--help"} & set(sys.argv):
         return
 
-    if len(sys.argv) < 2:  # No command provided
-        print("❌ No command provided. Use -h for help.")
+    if command is None:  # No command provided
+        _err("No command provided. Use -h for help.")
         sys.exit(0)
 
-    command = sys.argv[1]
+    # Collect the given flag names in one pass, accepting both --param value and --param=value
+    seen = {arg.split("=", 1)[0][2:] for arg in sys.argv[1:] if arg.startswith("--")}
 
-    def is_param_present(param):
-        """Check if a param exists in sys.argv, even if given as --param=value"""
-        return any(arg.startswith(f"--{param}=") or arg == f"--{param}" for arg in sys.argv)
-
-    missing_params = []
-
-    if command in ["scale", "info", "diagnostic"]:
-        if not is_param_present("deployment"):
-            missing_params.append("deployment")
-
-    if command == "scale" and not is_param_present("replicas"):
-        missing_params.append("replicas")
+    flags = COMMANDS[command]["flags"] if command in COMMANDS else {}
+    missing_params = [name for name, (_, required, _) in flags.items() if required and name not in seen]
 
     # Prompt for missing params
     for param in missing_params:
@@ -61,58 +43,112 @@ def precheck_args():
         sys.argv.append(value)
 
 
-def main():
-    precheck_args()  # ✅ Run manual checks first
+# Command handlers, dispatched through HANDLERS; each returns an exit code
+# kube_utils is imported only inside them, so --help and argument errors never load the kubernetes client
+def run_list(args):
+    from kube_utils import list_deployments
+    return list_deployments(args.namespace)
 
-    parser = argparse.ArgumentParser(description="SRE CLI for Kubernetes")
-    parser.add_argument("--log", action="store_true", help="Enable logging (logs to file and prints logs)")
-    subparsers = parser.add_subparsers(dest="command", required=True)
 
-    # List Deployments
-    list_parser = subparsers.add_parser("list", help="List deployments")
-    list_parser.add_argument("--namespace", help="Namespace to list deployments from")
+def run_scale(args):
+    from kube_utils import scale_deployment
+    return scale_deployment(args.deployment, args.replicas, args.namespace)
 
-    # Scale Deployment
-    scale_parser = subparsers.add_parser("scale", help="Scale a deployment")
-    scale_parser.add_argument("--deployment", required=True, help="Deployment name")
-    scale_parser.add_argument("--replicas", required=True, type=int, help="Number of replicas")
-    scale_parser.add_argument("--namespace", help="Namespace of the deployment")
 
-    # Get Deployment Info
-    info_parser = subparsers.add_parser("info", help="Get deployment details")
-    info_parser.add_argument("--deployment", required=True, help="Deployment name")
-    info_parser.add_argument("--namespace", help="Namespace of the deployment")
+def run_info(args):
+    from kube_utils import get_deployment_info
+    return get_deployment_info(args.deployment, args.namespace)
 
-    # Diagnose Deployment
-    diagnostic_parser = subparsers.add_parser("diagnostic", help="Diagnose deployment")
-    diagnostic_parser.add_argument("--deployment", required=True, help="Deployment name")
-    diagnostic_parser.add_argument("--namespace", help="Namespace of the deployment")
-    diagnostic_parser.add_argument("--pod", help="Get detailed pod diagnostics", action="store_true")
 
-    # Parse arguments
-    args = parser.parse_args()
+def run_diagnostic(args):
+    from kube_utils import diagnose_deployment
+    return diagnose_deployment(args.deployment, args.namespace, args.pod, args.watch)
+
+
+def run_shell(args):
+    """Warm the deployment cache, then serve commands read from stdin until EOF or 'exit'."""
+    import shlex
+    from kube_utils import start_deployment_cache
+    start_deployment_cache(args.namespace)
+    print("Type a command (e.g. info --deployment=my-deployment), or 'exit' to quit.")
+
+    while True:
+        try:
+            line = input("sre> ").strip()
+        except (EOFError, KeyboardInterrupt):
+            print()
+            return 0
+
+        if not line:
+            continue
+        if line in ["exit", "quit"]:
+            return 0
+
+        try:
+            argv = shlex.split(line)
+            line_args = parse_args_fast(argv) or load_parser(find_command(argv)).parse_args(argv)
+        except ValueError as e:
+            _err(f"Could not parse command: {e}")
+            continue
+        except SystemExit:
+            continue  # argparse already printed the usage error or help
+
+        if line_args.command == "shell":
+            _err("Already running a shell.")
+            continue
+        run_command(line_args)
 
-    # Execute the corresponding function
-    if LOG_MODE:
-        logging.info(f"Executing command: {args.command} with args: {args}")
+
+def run_command(args):
+    """Execute the handler of a parsed command and return its exit code."""
+    from kube_utils import KubeError
+    from kubernetes.client.exceptions import ApiException
 
     try:
-        if args.command == "list":
-            list_deployments(args.namespace)
-        elif args.command == "scale":
-            scale_deployment(args.deployment, args.replicas, args.namespace)
-        elif args.command == "info":
-            get_deployment_info(args.deployment, args.namespace)
-        elif args.command == "diagnostic":
-            diagnose_deployment(args.deployment, args.namespace, args.pod)
+        return HANDLERS[args.command](args)
+    except (KubeError, ApiException) as e:
+        if log_utils.LOG_MODE:
+            log.error("%s", e)
         else:
-            parser.print_help()
+            _err(str(e))
     except Exception as e:
-        if LOG_MODE:
-            logging.error(f"Unexpected error: {e}", exc_info=True)
+        # Only pay for the traceback when it will be written to the log
+        if log_utils.LOG_MODE:
+            log.error("Unexpected error: %s", e, exc_info=True)
         else:
-            print(f"❌ Unexpected error: {e}")
+            _err(f"Unexpected error: {e}")
+    return 1
+
+
+# Handler for each command in _parser.COMMANDS
+HANDLERS = {
+    "list": run_list,
+    "scale": run_scale,
+    "info": run_info,
+    "diagnostic": run_diagnostic,
+    "shell": run_shell,
+}
+
+
+def main():
+    """Entry point: parse the command line, run the command and return its exit code."""
+    command = find_command(sys.argv[1:])
+    precheck_args(command)  # ✅ Run manual checks first
+
+    # Parse arguments; argparse is only built for help and error messages
+    args = parse_args_fast(sys.argv[1:]) or load_parser(command).parse_args()
+
+    # Set up logging only now, so --help and argument errors never touch the log file
+    log_utils.configure_logging(args.log, args.verbose)
+
+    # Execute the corresponding function
+    if log.isEnabledFor(logging.INFO):
+        # Only the command's own flags; the Namespace repr would also sort and print log and verbose
+        flags = {name: getattr(args, name) for name in COMMANDS[args.command]["flags"]}
+        log.info("Executing command: %s with args: %r", args.command, flags)
+
+    return run_command(args)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())